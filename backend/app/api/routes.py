@@ -1,7 +1,5 @@
 import os
 import asyncio
-import shutil
-import tempfile
 from fastapi import APIRouter, UploadFile, File, HTTPException, Form
 from typing import Optional, List
 from app.services.ingestion_service import IngestionService
@@ -33,18 +31,11 @@ async def transcribe_audio(file: UploadFile = File(...)):
     """Transcribe uploaded audio file"""
     try:
         suffix = os.path.splitext(file.filename)[1] if file.filename else ".wav"
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            content = await file.read()
-            tmp.write(content)
-            tmp_path = tmp.name
-            
-        result = await asyncio.to_thread(stt_service.transcribe_audio, tmp_path)
+        data = await file.read()
+        result = await asyncio.to_thread(stt_service.transcribe_bytes, data, suffix)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if 'tmp_path' in locals() and os.path.exists(tmp_path):
-            os.remove(tmp_path)
 
 @router.post("/ask", response_model=AnswerResponse)
 async def ask_question(request: AskRequest):
@@ -64,18 +55,11 @@ async def ask_from_audio(file: UploadFile = File(...)):
     """Transcribe audio and ask question based on ingested documents"""
     try:
         suffix = os.path.splitext(file.filename)[1] if file.filename else ".wav"
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            content = await file.read()
-            tmp.write(content)
-            tmp_path = tmp.name
-            
-        try:
-            # Transcribe
-            transcription_result = await asyncio.to_thread(stt_service.transcribe_audio, tmp_path)
-        finally:
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
-        
+        data = await file.read()
+
+        # Transcribe
+        transcription_result = await asyncio.to_thread(stt_service.transcribe_bytes, data, suffix)
+
         # Handle transcription result
         if isinstance(transcription_result, dict):
             query_text = transcription_result.get("text", "")
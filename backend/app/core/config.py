@@ -13,9 +13,20 @@ class Settings(BaseSettings):
     # LLM Configuration (Ollama)
     OLLAMA_BASE_URL: str = "http://localhost:11434"
     LLM_MODEL: str = "llama3"
+    # How long Ollama keeps the model resident between calls; avoids paying
+    # a model reload on sparse traffic
+    OLLAMA_KEEP_ALIVE: str = "30m"
     
     # STT Configuration
     WHISPER_MODEL_SIZE: str = "base"
+    # Skip FFmpeg (and noise reduction on clean clips) when the upload is
+    # already 16kHz mono, e.g. browser MediaRecorder output
+    STT_FAST_PATH: bool = True
+
+    # Optional int8 ONNX model paths (exported via optimum-cli and quantized
+    # for the local CPU). Empty string keeps the default fp32 PyTorch models.
+    EMBEDDINGS_INT8_PATH: str = ""
+    RERANKER_INT8_PATH: str = ""
     
     # Database & Storage
     CHROMA_DB_PATH: str = "backend/data/vector_db"
@@ -1,9 +1,29 @@
+import asyncio
+
+try:
+    # uvloop roughly doubles socket I/O throughput; fall back to the stock
+    # loop where it is unavailable (e.g. Windows)
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import router
+from app.api.routes import router, ingestion_service, rag_service, stt_service
 
 app = FastAPI(title="RAG Speech Assistant API")
 
+@app.on_event("startup")
+async def warmup_models():
+    """Loads all heavy models concurrently so startup takes as long as the
+    slowest load rather than the sum of all of them."""
+    await asyncio.gather(
+        asyncio.to_thread(rag_service.warmup),
+        asyncio.to_thread(ingestion_service.warmup),
+        asyncio.to_thread(stt_service.warmup),
+    )
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
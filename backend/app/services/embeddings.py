@@ -0,0 +1,50 @@
+import threading
+from typing import List
+
+from sentence_transformers import SentenceTransformer
+from langchain_core.embeddings import Embeddings
+from loguru import logger
+
+from app.core.config import settings
+
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+
+# Process-wide shared model. IngestionService and RAGService both embed with
+# all-MiniLM-L6-v2; loading it once halves model-resident memory and warmup.
+# The lock matters because startup warms both services concurrently in
+# separate threads — without it each could observe None and load a copy.
+_model = None
+_model_lock = threading.Lock()
+
+def get_st_model() -> SentenceTransformer:
+    """Returns the shared SentenceTransformer instance, loading it on first use."""
+    global _model
+    with _model_lock:
+        if _model is None:
+            if settings.EMBEDDINGS_INT8_PATH:
+                # int8 ONNX export roughly doubles CPU throughput for this
+                # BERT-small encoder; fall back to fp32 if it cannot be loaded
+                try:
+                    logger.info(f"Loading int8 ONNX embedding model from {settings.EMBEDDINGS_INT8_PATH}...")
+                    _model = SentenceTransformer(settings.EMBEDDINGS_INT8_PATH, backend="onnx")
+                    return _model
+                except Exception as e:
+                    logger.warning(f"Failed to load int8 embedding model, falling back to fp32: {e}")
+            logger.info(f"Loading shared embedding model '{EMBEDDING_MODEL_NAME}'...")
+            _model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+        return _model
+
+class SharedSTEmbeddingFunction:
+    """Chroma-compatible embedding function backed by the shared model."""
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        return get_st_model().encode(input, convert_to_numpy=True).tolist()
+
+class SharedEmbeddings(Embeddings):
+    """LangChain Embeddings adapter backed by the shared model."""
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return get_st_model().encode(texts, convert_to_numpy=True).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return get_st_model().encode([text], convert_to_numpy=True)[0].tolist()
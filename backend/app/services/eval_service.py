@@ -1,5 +1,5 @@
+import csv
 from typing import List, Dict, Any
-import pandas as pd
 from datasets import Dataset
 from ragas import evaluate
 from ragas.metrics import (
@@ -72,6 +72,9 @@ class RAGEvaluator:
 
     def save_report(self, results: Dict[str, float], output_path: str = "evaluation_report.csv"):
         # RAGAS results object behaves like a dict but might need conversion
-        df = pd.DataFrame([dict(results)])
-        df.to_csv(output_path, index=False)
+        row = dict(results)
+        with open(output_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(row))
+            writer.writeheader()
+            writer.writerow(row)
         logger.info(f"Report saved to {output_path}")
\ No newline at end of file
@@ -1,16 +1,29 @@
 import os
 import shutil
 import uuid
+import asyncio
 import tempfile
+import threading
 from pathlib import Path
-import chromadb
-from chromadb.utils import embedding_functions
+import numpy as np
 from fastapi import UploadFile
 from loguru import logger
+from app.services.embeddings import SharedSTEmbeddingFunction, get_st_model
+from app.services.rag_service import RAGService
+from app.services.vector_store import get_chroma_client
 from app.utils.pdf_parser import DocumentParser
 from app.utils.chunking import DocumentChunker
 from app.core.config import settings
 
+# Max chunks per ChromaDB write. Smaller transactions bound peak memory and
+# let the event loop serve other requests between batches.
+INGEST_BATCH_SIZE = 256
+
+def _chunked(seq, n):
+    """Yields successive n-sized slices of seq."""
+    for i in range(0, len(seq), n):
+        yield seq[i:i + n]
+
 class IngestionService:
     def __init__(self):
         # Ensure data directories exist
@@ -26,22 +39,81 @@ class IngestionService:
             self.db_path = str(backend_root / db_path_setting)
             
         os.makedirs(self.db_path, exist_ok=True)
-        
-        # Initialize ChromaDB
-        self.client = chromadb.PersistentClient(path=self.db_path)
-        self.embedding_fn = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name="all-MiniLM-L6-v2"
-        )
-        self.collection = self.client.get_or_create_collection(
-            name="rag_documents",
-            embedding_function=self.embedding_fn
-        )
-        
+
+        # ChromaDB client/collection open in warmup() so construction stays
+        # cheap and startup loads can run concurrently
+        self.embedding_fn = SharedSTEmbeddingFunction()
+        self.client = None
+        self.collection = None
+        self._warmup_lock = threading.Lock()
+
         self.parser = DocumentParser()
         self.chunker = DocumentChunker()
 
+        # Memoized list_documents result; invalidated whenever a new
+        # document is ingested. Avoids re-scanning every chunk's metadata
+        # on each GET /documents.
+        self._documents_cache = None
+
+    def warmup(self):
+        """
+        Opens the ChromaDB collection and loads the shared embedding model.
+        Idempotent and thread-safe.
+        """
+        with self._warmup_lock:
+            if self.collection is not None:
+                return
+            get_st_model()
+            self.client = get_chroma_client(self.db_path)
+            self.collection = self.client.get_or_create_collection(
+                name="rag_documents",
+                embedding_function=self.embedding_fn
+            )
+            logger.info("Ingestion service warmup complete.")
+
+    def _embed_chunks(self, chunks):
+        """Batch-embeds chunks, sorted by length to minimize padding waste."""
+        # Encode in length order so batches contain similarly-sized inputs,
+        # then restore the original chunk order.
+        order = sorted(range(len(chunks)), key=lambda i: len(chunks[i]))
+        embeddings = get_st_model().encode(
+            [chunks[i] for i in order],
+            batch_size=64,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+        unsorted = [None] * len(chunks)
+        for position, original_index in enumerate(order):
+            unsorted[original_index] = embeddings[position].tolist()
+        return unsorted
+
+    def _process_file(self, tmp_path: str, safe_filename: str):
+        """
+        Parses, chunks, and embeds one file. CPU-bound (PDF parse plus two
+        full embedding passes), so callers run it in a worker thread.
+        """
+        text = self.parser.extract_text_from_pdf(tmp_path)
+        if not text.strip():
+            logger.error("Extracted text is empty")
+            raise ValueError("Could not extract text from PDF (file might be empty or scanned image)")
+
+        metadata = self.parser.extract_metadata(tmp_path)
+        metadata["filename"] = safe_filename
+        metadata["source"] = safe_filename
+
+        chunks = self.chunker.semantic_chunking(text)
+        logger.info(f"Generated {len(chunks)} chunks")
+
+        ids = [str(uuid.uuid4()) for _ in chunks]
+        metadatas = [{"chunk_index": i, **metadata} for i in range(len(chunks))]
+        embeddings = self._embed_chunks(chunks)
+        return chunks, ids, metadatas, embeddings
+
     async def ingest_document(self, file: UploadFile):
         logger.info(f"Starting ingestion for file: {file.filename}")
+        if self.collection is None:
+            await asyncio.to_thread(self.warmup)
         # Use tempfile to handle upload safely and avoid path/permission issues
         suffix = Path(file.filename).suffix if file.filename else ".pdf"
         
@@ -50,37 +122,45 @@ class IngestionService:
             tmp_path = tmp.name
         
         try:
-            # Save uploaded file content
-            # Using await file.read() is safer for FastAPI UploadFile than copyfileobj on file.file
-            content = await file.read()
+            # Stream the upload to disk in 1MB chunks so a large PDF never
+            # has to fit in memory and the event loop stays responsive
             with open(tmp_path, "wb") as f:
-                f.write(content)
-            
-            logger.info(f"File saved to temp path: {tmp_path}, size: {len(content)} bytes")
-
-            # Extract text and metadata
-            text = self.parser.extract_text_from_pdf(tmp_path)
-            if not text.strip():
-                logger.error("Extracted text is empty")
-                raise ValueError("Could not extract text from PDF (file might be empty or scanned image)")
-                
-            metadata = self.parser.extract_metadata(tmp_path)
+                while chunk := await file.read(1 << 20):
+                    f.write(chunk)
+
+            logger.info(f"File saved to temp path: {tmp_path}, size: {os.path.getsize(tmp_path)} bytes")
+
+            # Parse, chunk, and embed off the event loop: the embedding
+            # forward passes (sentences for chunking, then every chunk)
+            # dominate ingestion and would otherwise stall concurrent
+            # requests for the whole encode
             safe_filename = file.filename or f"upload_{uuid.uuid4()}{suffix}"
-            metadata["filename"] = safe_filename
-            metadata["source"] = safe_filename
-            
-            # Chunk text
-            chunks = self.chunker.semantic_chunking(text)
-            logger.info(f"Generated {len(chunks)} chunks")
-            
-            # Prepare for Vector DB
-            ids = [str(uuid.uuid4()) for _ in chunks]
-            metadatas = [{"chunk_index": i, **metadata} for i in range(len(chunks))]
-            
-            # Add to ChromaDB
-            self.collection.add(documents=chunks, metadatas=metadatas, ids=ids)
+            chunks, ids, metadatas, embeddings = await asyncio.to_thread(
+                self._process_file, tmp_path, safe_filename
+            )
+
+            # Writes go in micro-batches off the event loop so a large PDF
+            # does not block concurrent requests or spike memory in one
+            # giant transaction.
+            for doc_batch, emb_batch, meta_batch, id_batch in zip(
+                _chunked(chunks, INGEST_BATCH_SIZE),
+                _chunked(embeddings, INGEST_BATCH_SIZE),
+                _chunked(metadatas, INGEST_BATCH_SIZE),
+                _chunked(ids, INGEST_BATCH_SIZE)
+            ):
+                await asyncio.to_thread(
+                    self.collection.add,
+                    documents=doc_batch,
+                    embeddings=emb_batch,
+                    metadatas=meta_batch,
+                    ids=id_batch
+                )
             logger.info("Chunks added to ChromaDB")
-            
+            # The corpus changed: drop the memoized document list and any
+            # semantically-cached answers built against the old corpus
+            self._documents_cache = None
+            RAGService.invalidate_semantic_caches()
+
             return {"filename": safe_filename, "chunks_ingested": len(chunks), "status": "success"}
             
         except Exception as e:
@@ -95,24 +175,34 @@ class IngestionService:
     def list_documents(self):
         """List all ingested documents."""
         try:
+            if self._documents_cache is not None:
+                return self._documents_cache
+            if self.collection is None:
+                self.warmup()
             # Fetch all metadata to find unique sources
             result = self.collection.get(include=['metadatas'])
             metadatas = result.get('metadatas', []) or []
-            
-            unique_files = {}
-            for meta in metadatas:
-                source = meta.get('source', 'Unknown')
-                if source not in unique_files:
-                    unique_files[source] = {
-                        "filename": source,
-                        "chunk_count": 0,
-                        "total_pages": meta.get("pages", 0),
-                        "title": meta.get("title", "Unknown"),
-                        "author": meta.get("author", "Unknown")
-                    }
-                unique_files[source]["chunk_count"] += 1
-                
-            return list(unique_files.values())
+            if not metadatas:
+                return []
+
+            # Aggregate in NumPy: one contiguous pass over the sources array
+            # instead of per-chunk dict lookups and membership tests
+            sources = np.array([meta.get('source', 'Unknown') for meta in metadatas], dtype=object)
+            unique, first_seen, counts = np.unique(sources, return_index=True, return_counts=True)
+
+            documents = []
+            for source, index, count in zip(unique, first_seen, counts):
+                meta = metadatas[index]
+                documents.append({
+                    "filename": source,
+                    "chunk_count": int(count),
+                    "total_pages": meta.get("pages", 0),
+                    "title": meta.get("title", "Unknown"),
+                    "author": meta.get("author", "Unknown")
+                })
+
+            self._documents_cache = documents
+            return self._documents_cache
         except Exception as e:
             logger.error(f"Failed to list documents: {e}")
             return []
\ No newline at end of file
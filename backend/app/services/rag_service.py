@@ -1,10 +1,15 @@
 import os
-import math
+import re
+import json
+import asyncio
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import List, Dict, Any, Optional, AsyncGenerator
 
+import numpy as np
+
 from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.chat_models import ChatOllama
 from langchain.chains.history_aware_retriever import create_history_aware_retriever
 from langchain.chains.retrieval import create_retrieval_chain
@@ -16,25 +21,63 @@ from langchain_community.cross_encoders import HuggingFaceCrossEncoder
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import HumanMessage, AIMessage
 from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import RunnableLambda
 from langchain_core.retrievers import BaseRetriever
 from langchain_core.callbacks import CallbackManagerForRetrieverRun
 from langchain_core.documents import Document
 from loguru import logger
 
 from app.core.config import settings
+from app.services.embeddings import SharedEmbeddings
+from app.services.vector_store import get_chroma_client
+
+# Semantic answer cache tuning
+SEMANTIC_CACHE_THRESHOLD = 0.95  # min cosine similarity to count as a repeat query
+SEMANTIC_CACHE_MAX_ENTRIES = 10_000  # ring-buffer cap to bound memory
+
+# Sentinel emitted by the QA prompt so groundedness comes out of the same
+# LLM call as the answer instead of a second round-trip
+GROUNDED_SENTINEL_RE = re.compile(r"GROUNDED:\s*(YES|NO)\s*$", re.IGNORECASE)
+
+# Cap on cached HyDE hypothetical documents
+HYDE_CACHE_MAX_ENTRIES = 1000
 
 class RunnableRetriever(BaseRetriever):
     """Wraps a Runnable (chain) to conform to the BaseRetriever interface."""
     runnable: Any
-    
+
     def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
         return self.runnable.invoke(query)
 
+    async def _aget_relevant_documents(self, query: str, *, run_manager) -> List[Document]:
+        return await self.runnable.ainvoke(query)
+
+class BatchedCrossEncoder(HuggingFaceCrossEncoder):
+    """
+    Cross-encoder that scores every (query, doc) candidate pair in a single
+    forward pass, instead of the underlying model's default mini-batching.
+    The candidate set (fetch_k=20) fits one batch, so reranking costs one
+    batched GEMM rather than several smaller dispatches.
+    """
+    batch_size: int = 32
+
+    def score(self, text_pairs: List[List[str]]) -> List[float]:
+        return self.client.predict(
+            text_pairs,
+            batch_size=max(len(text_pairs), self.batch_size)
+        )
+
 class RAGService:
+    # Live instances, so ingestion can invalidate answer caches that were
+    # built against the pre-ingest corpus (both API entry points construct
+    # their own service)
+    _instances: List["RAGService"] = []
+
     def __init__(self):
-        # Initialize Embeddings
+        # Initialize Embeddings (shared with IngestionService)
         logger.info("Initializing RAG Service...")
-        self.embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+        self.embeddings = SharedEmbeddings()
+        RAGService._instances.append(self)
         
         # Initialize Vector DB
         # settings.BASE_DIR is backend/app
@@ -42,35 +85,95 @@ class RAGService:
         db_path_setting = Path(settings.CHROMA_DB_PATH)
         
         if db_path_setting.is_absolute():
-            vector_db_path = str(db_path_setting)
+            self._vector_db_path = str(db_path_setting)
         else:
             if len(db_path_setting.parts) > 0 and db_path_setting.parts[0] == 'backend' and backend_root.name == 'backend':
                 db_path_setting = Path(*db_path_setting.parts[1:])
-            vector_db_path = str(backend_root / db_path_setting)
-            
-        logger.info(f"Connecting to Vector DB at {vector_db_path}")
-        self.vector_db = Chroma(
-            persist_directory=vector_db_path,
-            embedding_function=self.embeddings,
-            collection_name="rag_documents"
-        )
-        
-        # Initialize LLM
+            self._vector_db_path = str(backend_root / db_path_setting)
+
+        # Heavy components (vector DB, cross-encoder, embedding weights) are
+        # loaded in warmup() so construction stays cheap and the loads can run
+        # concurrently at startup
+        self.vector_db = None
+        self.cross_encoder = None
+        self._warmup_lock = threading.Lock()
+
+        # Initialize LLM (the client itself is cheap; no connection is made
+        # until the first call)
         logger.info(f"Initializing LLM: {settings.LLM_MODEL} at {settings.OLLAMA_BASE_URL}")
         self.llm = ChatOllama(
             base_url=settings.OLLAMA_BASE_URL,
             model=settings.LLM_MODEL,
-            temperature=0.1
+            temperature=0.1,
+            keep_alive=settings.OLLAMA_KEEP_ALIVE
         )
-        
-        # Initialize Re-ranking Model (Cross-Encoder)
-        logger.info("Initializing Cross-Encoder for re-ranking...")
-        self.cross_encoder = HuggingFaceCrossEncoder(model_name="cross-encoder/ms-marco-MiniLM-L-6-v2")
-        
+
+        # Deterministic LLM for HyDE so cached hypothetical documents stay
+        # valid across repeat queries
+        self.hyde_llm = ChatOllama(
+            base_url=settings.OLLAMA_BASE_URL,
+            model=settings.LLM_MODEL,
+            temperature=0,
+            keep_alive=settings.OLLAMA_KEEP_ALIVE
+        )
+        self._hyde_cache = OrderedDict()
+
+        # Semantic answer cache: normalized query embeddings + cached responses.
+        # Paraphrases of recent queries skip the full retrieve/rerank/LLM pipeline.
+        self._cache_embeddings = np.empty((0, 384), dtype=np.float32)
+        self._cache_responses = []
+
+        # Assembled chains are stateless w.r.t. the query, so they can be
+        # cached per (filters, flags) combination instead of rebuilt per request
+        self._chain_cache = {}
+
         # Pre-compile prompts to save time per request
         self._setup_prompts()
         logger.info("RAG Service initialized successfully.")
 
+    def warmup(self):
+        """
+        Loads the heavy components (vector DB, embedding model, cross-encoder).
+        Idempotent and thread-safe; runs eagerly at startup and lazily on the
+        first request that needs them.
+        """
+        with self._warmup_lock:
+            if self.vector_db is not None:
+                return
+            logger.info(f"Connecting to Vector DB at {self._vector_db_path}")
+            vector_db = Chroma(
+                client=get_chroma_client(self._vector_db_path),
+                embedding_function=self.embeddings,
+                collection_name="rag_documents"
+            )
+
+            # Preheat: pull the HNSW index and SQLite pages into memory so the
+            # first real query after boot skips the cold reads
+            try:
+                vector_db.similarity_search("warmup", k=1)
+            except Exception as e:
+                logger.warning(f"Vector DB warmup query failed: {e}")
+
+            # Initialize Re-ranking Model (Cross-Encoder)
+            logger.info("Initializing Cross-Encoder for re-ranking...")
+            cross_encoder = None
+            if settings.RERANKER_INT8_PATH:
+                try:
+                    logger.info(f"Loading int8 ONNX reranker from {settings.RERANKER_INT8_PATH}...")
+                    cross_encoder = BatchedCrossEncoder(
+                        model_name=settings.RERANKER_INT8_PATH,
+                        model_kwargs={"backend": "onnx"}
+                    )
+                except Exception as e:
+                    logger.warning(f"Failed to load int8 reranker, falling back to fp32: {e}")
+            if cross_encoder is None:
+                cross_encoder = BatchedCrossEncoder(model_name="cross-encoder/ms-marco-MiniLM-L-6-v2")
+            self.cross_encoder = cross_encoder
+
+            # Assign last so concurrent callers never see a half-warmed service
+            self.vector_db = vector_db
+            logger.info("RAG Service warmup complete.")
+
     def _setup_prompts(self):
         """Initialize prompts for the RAG pipeline."""
         
@@ -99,7 +202,9 @@ class RAGService:
             "the question. Think step by step to reason through the "
             "information provided. If you don't know the answer, say that you "
             "don't have enough information. Use three sentences maximum "
-            "and keep the answer concise.\n\n"
+            "and keep the answer concise. On the final line, output exactly "
+            "one of 'GROUNDED: YES' or 'GROUNDED: NO' indicating whether "
+            "every claim in your answer is supported by the Context.\n\n"
             "Context:\n{context}"
         )
         qa_prompt = ChatPromptTemplate.from_messages(
@@ -146,30 +251,61 @@ class RAGService:
     def _get_rag_chain(self, filters: Optional[Dict[str, Any]] = None, enable_query_expansion: bool = False, enable_hyde: bool = False):
         """
         Constructs the RAG chain dynamically with optional filters and re-ranking.
+        Chains are cached per configuration to skip rebuilding the retriever
+        stack (and LangChain graph validation) on every request.
         """
+        # Serialize filters for the key: values can be nested dicts/lists
+        # (operator-style Chroma filters like {"$and": [...]}), which are
+        # unhashable as tuples
+        cache_key = (
+            json.dumps(filters, sort_keys=True, default=str) if filters else None,
+            enable_query_expansion,
+            enable_hyde
+        )
+        if cache_key in self._chain_cache:
+            return self._chain_cache[cache_key]
+
+        if self.vector_db is None:
+            self.warmup()
+
         # 1. Configure Base Retriever
-        # Fetch more documents initially (fetch_k=20) to allow for re-ranking
-        search_kwargs = {"k": 10, "fetch_k": 20}
+        # Fetch 20 candidates by plain similarity; the cross-encoder reranker
+        # downstream provides the ranking quality, so MMR's O(k^2)
+        # diversification pass would be redundant work
+        search_kwargs = {"k": 20}
         if filters:
             search_kwargs["filter"] = filters
-            
+
         base_retriever = self.vector_db.as_retriever(
-            search_type="mmr",
+            search_type="similarity",
             search_kwargs=search_kwargs
         )
         
         # 2. Apply Advanced Retrieval Strategies
         if enable_hyde:
             logger.info("Enabling HyDE (Hypothetical Document Embeddings) retrieval.")
-            # Chain: Generate HyDE Doc -> Retrieve using HyDE Doc
-            hyde_chain = (
-                self.hyde_prompt 
-                | self.llm 
-                | StrOutputParser() 
-                | base_retriever
-            )
+            # Chain: Generate HyDE Doc (cached per query) -> Retrieve using HyDE Doc
+            hyde_chain = self.hyde_prompt | self.hyde_llm | StrOutputParser()
+            retriever = base_retriever
+
+            def _hyde_retrieve(query: str):
+                doc = self._hyde_cache_get(query)
+                if doc is None:
+                    doc = hyde_chain.invoke({"input": query})
+                    self._hyde_cache_put(query, doc)
+                return retriever.invoke(doc)
+
+            async def _ahyde_retrieve(query: str):
+                doc = self._hyde_cache_get(query)
+                if doc is None:
+                    doc = await hyde_chain.ainvoke({"input": query})
+                    self._hyde_cache_put(query, doc)
+                return await retriever.ainvoke(doc)
+
             # Wrap as a retriever so it can be used in the next steps
-            base_retriever = RunnableRetriever(runnable=hyde_chain)
+            base_retriever = RunnableRetriever(
+                runnable=RunnableLambda(_hyde_retrieve, afunc=_ahyde_retrieve)
+            )
             
         elif enable_query_expansion:
             logger.info("Enabling Query Expansion retrieval.")
@@ -191,26 +327,100 @@ class RAGService:
         )
         
         # Combine into final RAG chain
-        return create_retrieval_chain(history_aware_retriever, self.question_answer_chain)
+        chain = create_retrieval_chain(history_aware_retriever, self.question_answer_chain)
+        self._chain_cache[cache_key] = chain
+        return chain
+
+    def _hyde_cache_get(self, query: str) -> Optional[str]:
+        """Returns a cached hypothetical document for the query, if any."""
+        key = query.strip().lower()
+        doc = self._hyde_cache.get(key)
+        if doc is not None:
+            self._hyde_cache.move_to_end(key)
+        return doc
+
+    def _hyde_cache_put(self, query: str, doc: str):
+        """Caches a hypothetical document, evicting the least recent when full."""
+        self._hyde_cache[query.strip().lower()] = doc
+        if len(self._hyde_cache) > HYDE_CACHE_MAX_ENTRIES:
+            self._hyde_cache.popitem(last=False)
+
+    def _embed_query_normalized(self, query: str) -> np.ndarray:
+        """Embeds a query and L2-normalizes it for cosine similarity."""
+        vector = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+    def _semantic_cache_lookup(self, query_vector: np.ndarray) -> Optional[Dict[str, Any]]:
+        """Returns a cached response if a previous query is close enough in embedding space."""
+        if len(self._cache_responses) == 0:
+            return None
+        # Embeddings are normalized, so the dot product is cosine similarity
+        similarities = self._cache_embeddings @ query_vector
+        best = int(np.argmax(similarities))
+        if similarities[best] >= SEMANTIC_CACHE_THRESHOLD:
+            logger.info(f"Semantic cache hit (similarity={similarities[best]:.3f})")
+            return self._cache_responses[best]
+        return None
+
+    def clear_semantic_cache(self):
+        """Drops cached answers; they may cite a stale corpus after ingest."""
+        self._cache_embeddings = np.empty((0, 384), dtype=np.float32)
+        self._cache_responses = []
+
+    @classmethod
+    def invalidate_semantic_caches(cls):
+        """Clears the semantic answer cache on every live service."""
+        for service in cls._instances:
+            service.clear_semantic_cache()
+
+    def _semantic_cache_store(self, query_vector: np.ndarray, response: Dict[str, Any]):
+        """Stores a response in the semantic cache, evicting the oldest entry when full."""
+        self._cache_embeddings = np.vstack([self._cache_embeddings, query_vector[None]])
+        self._cache_responses.append(response)
+        if len(self._cache_responses) > SEMANTIC_CACHE_MAX_ENTRIES:
+            self._cache_embeddings = self._cache_embeddings[1:]
+            self._cache_responses.pop(0)
 
     def _calculate_confidence(self, docs) -> float:
         """Calculates confidence score based on re-ranking logits."""
         if not docs:
             return 0.0
-        # Extract relevance scores (logits) and apply sigmoid to normalize to 0-1
-        scores = [doc.metadata.get("relevance_score", 0.0) for doc in docs]
+        # Extract relevance scores (logits) and apply a vectorized sigmoid
+        # to normalize to 0-1
+        scores = np.fromiter(
+            (doc.metadata.get("relevance_score", 0.0) for doc in docs),
+            dtype=np.float32,
+            count=len(docs)
+        )
         # Average probability
-        avg_score = sum(1 / (1 + math.exp(-s)) for s in scores) / len(scores)
+        avg_score = float((1.0 / (1.0 + np.exp(-scores))).mean())
         return round(avg_score, 2)
 
-    async def validate_answer(self, answer: str, context: List[Document]) -> bool:
+    def _parse_grounded_sentinel(self, answer: str):
+        """
+        Extracts the 'GROUNDED: YES|NO' sentinel from a generated answer.
+        Returns (answer_without_sentinel, is_grounded) where is_grounded is
+        None if the model did not emit the sentinel.
+        """
+        match = GROUNDED_SENTINEL_RE.search(answer)
+        if not match:
+            return answer, None
+        return answer[:match.start()].rstrip(), match.group(1).upper() == "YES"
+
+    async def validate_answer(self, answer: str, context: List[Document], context_text: Optional[str] = None) -> bool:
         """
         Validates if the generated answer is grounded in the retrieved context.
+        Callers that already hold the joined context text can pass it via
+        context_text to skip re-concatenating the documents.
         """
         if not context:
             return False
-            
-        context_text = "\n\n".join([doc.page_content for doc in context])
+
+        if context_text is None:
+            context_text = "\n\n".join([doc.page_content for doc in context])
         # Simple chain for validation
         chain = self.validation_prompt | self.llm | StrOutputParser()
         
@@ -263,9 +473,18 @@ class RAGService:
                     "contexts": []
                 }
 
+            # Semantic cache: only safe for stateless, unfiltered, default-pipeline queries
+            cacheable = not chat_history and not filters and not enable_query_expansion and not enable_hyde
+            query_vector = None
+            if cacheable:
+                query_vector = self._embed_query_normalized(query)
+                cached = self._semantic_cache_lookup(query_vector)
+                if cached is not None:
+                    return cached
+
             # Get chain configured with filters
             rag_chain = self._get_rag_chain(filters, enable_query_expansion, enable_hyde)
-            
+
             # Invoke chain
             response = await rag_chain.ainvoke({
                 "input": query,
@@ -274,10 +493,26 @@ class RAGService:
             
             answer = response["answer"]
             context_docs = response["context"]
-            
+
+            # Groundedness rides along in the generation output, saving the
+            # second Ollama round-trip validate_answer would cost
+            answer, is_grounded = self._parse_grounded_sentinel(answer)
+
+            # Contexts are needed for the response payload and (joined) for
+            # validation, so build them once up front
+            full_contexts = [doc.page_content for doc in context_docs]
+            context_text = "\n\n".join(full_contexts)
+
+            # If the model skipped the sentinel, start the standalone
+            # validation call now so it overlaps with source assembly below
+            validate_task = None
+            if is_grounded is None:
+                validate_task = asyncio.create_task(
+                    self.validate_answer(answer, context_docs, context_text=context_text)
+                )
+
             # Extract sources
             sources = []
-            full_contexts = []
             for doc in context_docs:
                 source_name = Path(doc.metadata.get("source", "unknown")).name
                 page_num = doc.metadata.get("page", 0)
@@ -288,21 +523,25 @@ class RAGService:
                     "snippet": doc.page_content[:200] + "...",
                     "relevance_score": doc.metadata.get("relevance_score", 0.0) # Added by re-ranker if available
                 })
-                full_contexts.append(doc.page_content)
-            
+
             confidence = self._calculate_confidence(context_docs)
             
-            # Validate Answer
-            is_grounded = await self.validate_answer(answer, context_docs)
-            
-            return {
+            if validate_task is not None:
+                is_grounded = await validate_task
+
+            result = {
                 "answer": answer,
                 "sources": sources,
                 "confidence": confidence,
                 "is_grounded": is_grounded,
                 "contexts": full_contexts
             }
-            
+
+            if cacheable:
+                self._semantic_cache_store(query_vector, result)
+
+            return result
+
         except Exception as e:
             logger.error(f"RAG generation failed: {e}")
             if "Connect call failed" in str(e) or "Cannot connect to host" in str(e):
@@ -328,7 +567,13 @@ class RAGService:
 
         try:
             rag_chain = self._get_rag_chain(filters, enable_query_expansion, enable_hyde)
-            
+
+            # Hold back a small tail of the token stream so the trailing
+            # 'GROUNDED: YES|NO' sentinel can be stripped before it reaches
+            # the client
+            tail_size = 24
+            tail = ""
+
             # astream yields chunks of the output dictionary
             async for chunk in rag_chain.astream({
                 "input": query,
@@ -343,10 +588,19 @@ class RAGService:
                             "snippet": doc.page_content[:200] + "..."
                         })
                     yield {"type": "sources", "data": sources}
-                
+
                 if "answer" in chunk:
-                    yield {"type": "token", "data": chunk["answer"]}
-                    
+                    tail += chunk["answer"]
+                    if len(tail) > tail_size:
+                        yield {"type": "token", "data": tail[:-tail_size]}
+                        tail = tail[-tail_size:]
+
+            remainder, is_grounded = self._parse_grounded_sentinel(tail)
+            if remainder:
+                yield {"type": "token", "data": remainder}
+            if is_grounded is not None:
+                yield {"type": "grounded", "data": is_grounded}
+
         except Exception as e:
             logger.error(f"RAG streaming failed: {e}")
             yield {"type": "error", "data": str(e)}
\ No newline at end of file
@@ -1,174 +1,477 @@
+import io
 import os
+import mmap
+import time
 import tempfile
 import json
+import sqlite3
 import hashlib
+import threading
 import subprocess
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Union
+from typing import Dict, Any, Optional, Union
 
 import torch
-import whisper
 import numpy as np
 import soundfile as sf
-import noisereduce as nr
+from faster_whisper import WhisperModel
+from faster_whisper.audio import decode_audio
 from loguru import logger
 
 from app.core.config import settings
 
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+def new_content_hasher():
+    """
+    Returns an incremental hasher matching _compute_file_hash's digest, so
+    callers that already stream the bytes (e.g. upload handlers) can build
+    the cache key during the copy instead of re-reading the file.
+    """
+    return blake3.blake3() if blake3 is not None else hashlib.blake2b()
+
+def _spectral_gate(
+    data: np.ndarray,
+    rate: int = 16000,
+    frame_size: int = 2048,
+    hop: int = 512,
+    noise_seconds: float = 0.5,
+    reduction: float = 0.75,
+    gain_floor: float = 0.1
+) -> np.ndarray:
+    """
+    Streaming spectral-gate noise reduction in float32.
+
+    Estimates a stationary noise spectrum from the first noise_seconds of the
+    clip, then attenuates each Hann-windowed frame's bins toward that profile
+    and reconstructs via rFFT overlap-add. Frames are processed in batches so
+    the working set stays small regardless of clip length.
+    """
+    data = data.astype(np.float32, copy=False)
+    if len(data) < frame_size * 2:
+        return data
+
+    window = np.hanning(frame_size).astype(np.float32)
+    padded = np.pad(data, (0, frame_size))
+    frames = np.lib.stride_tricks.sliding_window_view(padded, frame_size)[::hop]
+
+    # Noise profile: mean power spectrum over the leading frames
+    noise_frame_count = max(1, int(noise_seconds * rate / hop))
+    noise_spec = np.mean(
+        np.abs(np.fft.rfft(frames[:noise_frame_count] * window, axis=1)) ** 2,
+        axis=0
+    )
+
+    out = np.zeros(len(padded), dtype=np.float32)
+    weight = np.zeros(len(padded), dtype=np.float32)
+    window_sq = window * window
+
+    batch = 128  # frames per FFT batch (~64k samples of audio)
+    for start in range(0, len(frames), batch):
+        spectra = np.fft.rfft(frames[start:start + batch] * window, axis=1)
+        power = spectra.real ** 2 + spectra.imag ** 2
+        gain = np.maximum(1.0 - reduction * noise_spec / np.maximum(power, 1e-10), gain_floor)
+        spectra *= gain
+        recon = np.fft.irfft(spectra, n=frame_size, axis=1).astype(np.float32) * window
+        for j in range(recon.shape[0]):
+            pos = (start + j) * hop
+            out[pos:pos + frame_size] += recon[j]
+            weight[pos:pos + frame_size] += window_sq
+
+    out /= np.maximum(weight, 1e-8)
+    return out[:len(data)]
+
+class TranscriptionCache:
+    """
+    SQLite-backed LRU cache for transcription results.
+
+    Replaces the old JSON file that was read whole at startup and rewritten
+    whole on every insertion: lookups are single indexed SELECTs, writes are
+    single-row upserts, and an access-time cap keeps the store bounded.
+    """
+
+    def __init__(self, db_path: Path, max_entries: int = 256):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (hash TEXT PRIMARY KEY, result TEXT, atime INTEGER)"
+        )
+        self._conn.commit()
+
+    def get(self, file_hash: str):
+        """Returns the cached result dict, or None. Refreshes recency."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM cache WHERE hash = ?", (file_hash,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE cache SET atime = ? WHERE hash = ?", (int(time.time()), file_hash)
+            )
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def put(self, file_hash: str, result: Dict[str, Any]):
+        """Stores a result and evicts the least-recently-used overflow."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (hash, result, atime) VALUES (?, ?, ?)",
+                (file_hash, json.dumps(result, ensure_ascii=False), int(time.time()))
+            )
+            self._conn.execute(
+                "DELETE FROM cache WHERE hash NOT IN "
+                "(SELECT hash FROM cache ORDER BY atime DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+@lru_cache(maxsize=1)
+def get_whisper_model(model_size: str, device: str, compute_type: str) -> WhisperModel:
+    """
+    Loads the Whisper checkpoint once per process.
+
+    Both API entry points construct their own WhisperSTTService; caching
+    here means they share a single set of model weights instead of
+    loading a duplicate copy each.
+    """
+    logger.info(f"Loading Whisper model '{model_size}' ({compute_type}) on {device}...")
+    return WhisperModel(model_size, device=device, compute_type=compute_type)
+
 class WhisperSTTService:
     def __init__(self):
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         self.model_size = settings.WHISPER_MODEL_SIZE
-        self.cache_file = Path(settings.BASE_DIR) / "data" / "transcription_cache.json"
-        self._load_cache()
-        logger.info(f"Loading Whisper model '{self.model_size}' on {self.device}...")
-        
-        try:
-            self.model = whisper.load_model(self.model_size, device=self.device)
-            logger.info("Whisper model loaded successfully.")
-        except Exception as e:
-            logger.error(f"Failed to load Whisper model: {e}")
-            raise RuntimeError(f"Could not load Whisper model: {e}")
+        self.cache = TranscriptionCache(Path(settings.BASE_DIR) / "data" / "transcription_cache.db")
 
-    def _load_cache(self):
-        if self.cache_file.exists():
+        # Model checkpoint loads in warmup() so construction stays cheap and
+        # startup loads can run concurrently
+        self.model = None
+        self.batched_model = None
+        self._warmup_lock = threading.Lock()
+
+        # One-slot memo of the last preprocessed waveform, so the common
+        # detect_language -> transcribe_audio sequence decodes and denoises
+        # the file once. A single slot keeps no long-lived waveforms around.
+        self._decoded_audio = None
+
+    def warmup(self):
+        """Loads the Whisper checkpoint. Idempotent and thread-safe."""
+        with self._warmup_lock:
+            if self.model is not None:
+                return
+            # int8 weights: CTranslate2 runs quantized GEMMs (VNNI on CPU,
+            # fp16 accumulation on GPU) at a fraction of the reference
+            # PyTorch implementation's cost
+            compute_type = "int8_float16" if self.device == "cuda" else "int8"
             try:
-                with open(self.cache_file, "r", encoding="utf-8") as f:
-                    self.cache = json.load(f)
-            except json.JSONDecodeError:
-                self.cache = {}
-        else:
-            self.cache = {}
+                self.model = get_whisper_model(self.model_size, self.device, compute_type)
+                logger.info("Whisper model loaded successfully.")
+            except Exception as e:
+                logger.error(f"Failed to load Whisper model: {e}")
+                raise RuntimeError(f"Could not load Whisper model: {e}")
 
-    def _save_cache(self):
-        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.cache_file, "w", encoding="utf-8") as f:
-            json.dump(self.cache, f, ensure_ascii=False, indent=2)
+            # On GPU, batch 30s windows through the encoder in one pass
+            # instead of decoding them serially. Older faster-whisper
+            # releases lack the wrapper, so keep it optional.
+            if self.device == "cuda":
+                try:
+                    from faster_whisper import BatchedInferencePipeline
+                    self.batched_model = BatchedInferencePipeline(model=self.model)
+                    logger.info("Batched inference pipeline enabled.")
+                except ImportError:
+                    logger.info("BatchedInferencePipeline unavailable; using sequential decoding.")
 
     def _compute_file_hash(self, file_path: str) -> str:
-        sha256_hash = hashlib.sha256()
+        # Cache key only, not security: BLAKE3 hashes multiple GB/s via SIMD,
+        # and the stdlib fallback still runs its read loop in C rather than
+        # 4KB at a time through the interpreter
         with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
+            if blake3 is not None and os.path.getsize(file_path) > 0:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return blake3.blake3(mm).hexdigest()
+            return hashlib.file_digest(f, "blake2b").hexdigest()
 
-    def preprocess_audio(self, audio_path: Union[str, Path]) -> str:
+    def preprocess_audio(self, audio_path: Union[str, Path]) -> np.ndarray:
         """
-        Preprocesses audio: converts to 16kHz mono WAV and applies noise reduction.
-        Returns path to the processed temporary file.
+        Preprocesses audio fully in memory: FFmpeg decodes straight to 16kHz
+        mono float32 PCM on stdout, and noise reduction runs on the array.
+        Returns the processed waveform (16kHz mono float32).
         """
         audio_path = str(audio_path)
         logger.info(f"Preprocessing audio: {audio_path}")
-        
+
+        # Fast path: audio already in Whisper's input format needs no
+        # FFmpeg resample, and a clean clip needs no noise gate either
+        if settings.STT_FAST_PATH:
+            try:
+                info = sf.info(audio_path)
+            except Exception:
+                info = None  # not a soundfile-readable container
+            if info is not None and info.samplerate == 16000 and info.channels == 1:
+                data, _ = sf.read(audio_path, dtype="float32")
+                # A near-silent 10th-percentile floor in the first second
+                # means there is no stationary noise worth subtracting
+                lead = np.abs(data[:16000])
+                if len(lead) and np.percentile(lead, 10) < 1e-3:
+                    logger.info("Fast path: 16kHz mono and clean, skipping preprocessing")
+                    return data
+                try:
+                    return _spectral_gate(data)
+                except Exception as e:
+                    logger.warning(f"Noise reduction failed, using raw audio: {e}")
+                    return data
+
         try:
-            # 1. Format Conversion (Standardize to 16kHz Mono WAV)
-            # Export to temp file for processing
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_wav:
-                temp_wav_path = temp_wav.name
-            
-            # Use FFmpeg to convert to 16kHz mono WAV
+            # 1. Format Conversion (Standardize to 16kHz Mono)
+            # Pipe decoded PCM to stdout instead of round-tripping a temp WAV
             command = [
-                "ffmpeg", "-y", "-v", "error", "-i", audio_path,
-                "-ar", "16000", "-ac", "1", "-f", "wav", temp_wav_path
+                "ffmpeg", "-v", "error", "-i", audio_path,
+                "-f", "f32le", "-ar", "16000", "-ac", "1", "pipe:1"
             ]
-            subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            
-            # 2. Noise Reduction
-            data, rate = sf.read(temp_wav_path)
-            # Apply stationary noise reduction
-            reduced_noise = nr.reduce_noise(y=data, sr=rate, stationary=True, prop_decrease=0.75)
-            
-            # Save processed audio
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as processed_file:
-                processed_path = processed_file.name
-            sf.write(processed_path, reduced_noise, rate)
-            
-            # Cleanup intermediate file
-            os.remove(temp_wav_path)
-            
-            return processed_path
-            
+            proc = subprocess.Popen(
+                command,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                bufsize=1 << 20
+            )
+            raw, _ = proc.communicate()
+            if proc.returncode != 0 or not raw:
+                raise RuntimeError(f"FFmpeg exited with code {proc.returncode}")
+            data = np.frombuffer(raw, dtype=np.float32)
+        except Exception as e:
+            # Fall back to faster-whisper's PyAV loader (also 16kHz mono float32)
+            logger.warning(f"FFmpeg pipe decode failed ({e}), using decode_audio")
+            data = decode_audio(audio_path, sampling_rate=16000)
+
+        # 2. Noise Reduction (in RAM)
+        try:
+            data = _spectral_gate(data)
         except Exception as e:
-            logger.warning(f"Preprocessing failed, using original audio: {e}")
-            return audio_path
+            logger.warning(f"Noise reduction failed, using raw audio: {e}")
+
+        return data.astype(np.float32, copy=False)
+
+    def _get_preprocessed(self, audio_path: str) -> np.ndarray:
+        """
+        Returns the preprocessed waveform for a file, reusing the one-slot
+        memo when the same unmodified file was just decoded.
+        """
+        key = (audio_path, os.path.getmtime(audio_path))
+        if self._decoded_audio is not None and self._decoded_audio[0] == key:
+            logger.info(f"Reusing decoded waveform for {audio_path}")
+            return self._decoded_audio[1]
+        audio = self.preprocess_audio(audio_path)
+        self._decoded_audio = (key, audio)
+        return audio
 
-    def _transcribe_chunked(self, audio_path: str, total_duration: float) -> Dict[str, Any]:
+    def _run_transcription(self, audio, time_offset: float = 0.0):
         """
-        Helper to handle long audio files by splitting them into 10-minute chunks.
+        Runs faster-whisper on a waveform or file path.
+
+        Returns (segments, info) where segments is a list of JSON-serializable
+        dicts with timestamps shifted by time_offset. Consuming the segment
+        generator here is what actually performs the decode.
+        """
+        # Waveforms longer than one 30s window go through the batched
+        # pipeline when available so the GPU encodes windows in parallel
+        if self.batched_model is not None and not isinstance(audio, (str, Path)) and len(audio) > 30 * 16000:
+            segment_gen, info = self.batched_model.transcribe(
+                audio, beam_size=1, vad_filter=True, batch_size=16
+            )
+        else:
+            segment_gen, info = self.model.transcribe(audio, beam_size=1, vad_filter=True)
+        segments = []
+        for segment in segment_gen:
+            segments.append({
+                "id": segment.id,
+                "start": segment.start + time_offset,
+                "end": segment.end + time_offset,
+                "text": segment.text,
+                "avg_logprob": segment.avg_logprob,
+                "no_speech_prob": segment.no_speech_prob
+            })
+        return segments, info
+
+    def _find_split_points(
+        self,
+        data: np.ndarray,
+        samplerate: int,
+        target_samples: int,
+        search_seconds: int = 30,
+        min_gap_seconds: float = 0.3
+    ):
+        """
+        Chooses chunk boundaries at the quietest gap (>=300ms) within the
+        last search_seconds before each fixed-size target, so chunks end in
+        silence rather than mid-word.
+        """
+        block = samplerate // 10  # 100ms energy blocks
+        gap_blocks = max(1, int(min_gap_seconds * 10))
+        kernel = np.full(gap_blocks, 1.0 / gap_blocks, dtype=np.float32)
+
+        split_points = []
+        pos = 0
+        while len(data) - pos > target_samples:
+            target = pos + target_samples
+            lo = max(pos, target - search_seconds * samplerate)
+            window = data[lo:target]
+            usable = len(window) - len(window) % block
+            if usable >= block * (gap_blocks + 1):
+                energies = np.sqrt(
+                    (window[:usable].reshape(-1, block).astype(np.float32) ** 2).mean(axis=1)
+                )
+                smoothed = np.convolve(energies, kernel, mode="valid")
+                best = int(np.argmin(smoothed))
+                cut = lo + (best + gap_blocks // 2) * block
+            else:
+                cut = target
+            split_points.append(cut)
+            pos = cut
+        return split_points
+
+    def _transcribe_chunked(self, data: np.ndarray, total_duration: float) -> Dict[str, Any]:
+        """
+        Helper to handle long audio by splitting the preprocessed 16kHz mono
+        waveform into roughly 10-minute chunks cut at silence gaps.
         """
         logger.info(f"Audio duration ({total_duration:.2f}s) exceeds threshold. Using chunking strategy.")
-        
-        # Read the preprocessed wav file
-        data, samplerate = sf.read(audio_path)
+
+        samplerate = 16000
         chunk_length_samples = 10 * 60 * samplerate  # 10 minutes in samples
-        
-        full_text = []
+
         all_segments = []
-        confidences = []
         detected_language = "unknown"
-        
-        # Calculate number of chunks
-        num_chunks = int(np.ceil(len(data) / chunk_length_samples))
-        
+
+        # Cut at silence gaps near each 10-minute mark so Whisper never sees
+        # a mid-word seam; VAD inside each transcribe call handles the rest
+        boundaries = [0] + self._find_split_points(data, samplerate, chunk_length_samples) + [len(data)]
+        num_chunks = len(boundaries) - 1
+
+        # The waveform is already 16kHz mono float32, so each chunk is just a
+        # contiguous slice handed to the model — no WAV write/re-read per chunk
+        data = np.ascontiguousarray(data, dtype=np.float32)
+
         for i in range(num_chunks):
-            start = i * chunk_length_samples
-            end = min((i + 1) * chunk_length_samples, len(data))
+            start = boundaries[i]
+            end = boundaries[i + 1]
             chunk_data = data[start:end]
-            
+
             logger.info(f"Processing chunk {i+1}/{num_chunks}...")
-            
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_chunk:
-                chunk_path = temp_chunk.name
-            
-            try:
-                sf.write(chunk_path, chunk_data, samplerate)
-                
-                # Transcribe chunk
-                result = self.model.transcribe(chunk_path, fp16=(self.device == "cuda"))
-                
-                if i == 0:
-                    detected_language = result.get("language", "unknown")
-                
-                text = result.get("text", "").strip()
-                if text:
-                    full_text.append(text)
-                
-                # Adjust timestamps and collect segments
-                time_offset = start / float(samplerate)
-                for segment in result.get("segments", []):
-                    segment["start"] += time_offset
-                    segment["end"] += time_offset
-                    
-                    # Collect confidence
-                    logprob = segment.get("avg_logprob", -100.0)
-                    confidences.append(torch.exp(torch.tensor(logprob)).item())
-                    
-                    all_segments.append(segment)
-                    
-            finally:
-                if os.path.exists(chunk_path):
-                    os.remove(chunk_path)
-        
-        avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
-        combined_text = " ".join(full_text)
-        
-        logger.info(f"Chunked transcription complete. Confidence: {avg_confidence:.2f}")
-        
+
+            # Transcribe chunk with timestamps shifted to the full clip
+            segments, info = self._run_transcription(chunk_data, time_offset=start / float(samplerate))
+
+            if i == 0:
+                detected_language = info.language
+
+            all_segments.extend(segments)
+
+        return self._summarize_segments(all_segments, detected_language, total_duration)
+
+    def _summarize_segments(self, segments, language: str, duration: float) -> Dict[str, Any]:
+        """Builds the transcription response dict from collected segments."""
+        text = " ".join(s["text"].strip() for s in segments).strip()
+
+        # Calculate average confidence from segments in one vectorized pass
+        # (avg_logprob is log base e; exp converts to probability)
+        avg_confidence = 0.0
+        if segments:
+            logprobs = np.fromiter(
+                (s.get("avg_logprob", -100.0) for s in segments),
+                dtype=np.float32,
+                count=len(segments)
+            )
+            avg_confidence = float(np.exp(logprobs).mean())
+
+        logger.info(f"Transcription complete. Language: {language}, Confidence: {avg_confidence:.2f}")
+
         return {
-            "text": combined_text,
-            "language": detected_language,
+            "text": text,
+            "language": language,
             "confidence": avg_confidence,
-            "duration": total_duration,
-            "segments": all_segments
+            "duration": duration,
+            "segments": segments
         }
 
-    def transcribe_audio(self, audio_path: Union[str, Path]) -> Dict[str, Any]:
+    def transcribe_bytes(self, data: bytes, suffix: str = ".wav") -> Dict[str, Any]:
+        """
+        Transcribes in-memory audio bytes without a disk round-trip.
+
+        Decodes the bytes with soundfile and feeds Whisper the numpy array
+        directly. Falls back to the file-based pipeline (temp file + FFmpeg)
+        for formats soundfile cannot decode, non-16kHz audio, or long files
+        that need the chunking strategy.
+        """
+        # Same hasher as _compute_file_hash, so in-memory and file-path
+        # uploads of identical audio share one cache entry
+        hasher = new_content_hasher()
+        hasher.update(data)
+        file_hash = hasher.hexdigest()
+        cached = self.cache.get(file_hash)
+        if cached is not None:
+            logger.info("Returning cached transcription for in-memory audio")
+            return cached
+
+        if self.model is None:
+            self.warmup()
+
+        audio = None
+        rate = 0
+        try:
+            audio, rate = sf.read(io.BytesIO(data), dtype="float32")
+        except Exception as e:
+            logger.info(f"In-memory decode failed ({e}), falling back to file pipeline")
+
+        if audio is None or rate != 16000 or len(audio) / rate > 600:
+            # Compressed containers, non-16kHz audio, and long files go
+            # through the existing FFmpeg/chunking path
+            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+                tmp.write(data)
+                tmp_path = tmp.name
+            try:
+                return self.transcribe_audio(tmp_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+        # Downmix to mono if needed
+        if audio.ndim > 1:
+            audio = audio.mean(axis=1).astype(np.float32)
+
+        duration = len(audio) / rate
+        logger.info(f"Transcribing in-memory audio ({duration:.2f}s)")
+
+        try:
+            # Noise reduction in RAM, mirroring preprocess_audio
+            audio = _spectral_gate(audio, rate=rate)
+        except Exception as e:
+            logger.warning(f"Noise reduction failed, using raw audio: {e}")
+
+        try:
+            segments, info = self._run_transcription(np.ascontiguousarray(audio, dtype=np.float32))
+            summary = self._summarize_segments(segments, info.language, duration)
+            self.cache.put(file_hash, summary)
+            return summary
+        except Exception as e:
+            logger.error(f"Transcription failed: {e}")
+            raise RuntimeError(f"Transcription failed: {e}")
+
+    def transcribe_audio(self, audio_path: Union[str, Path], precomputed_hash: Optional[str] = None) -> Dict[str, Any]:
         """
         Transcribes an audio file to text.
-        
+
         Args:
             audio_path: Path to the audio file.
-            
+            precomputed_hash: Cache key already computed by the caller
+                (see new_content_hasher), skipping the re-read of the file.
+
         Returns:
             Dictionary containing text, language, confidence, and segments.
         """
@@ -178,62 +481,41 @@ class WhisperSTTService:
             raise FileNotFoundError(f"Audio file not found: {audio_path}")
 
         # 1. Check Cache
-        file_hash = self._compute_file_hash(audio_path)
-        if file_hash in self.cache:
+        file_hash = precomputed_hash or self._compute_file_hash(audio_path)
+        cached = self.cache.get(file_hash)
+        if cached is not None:
             logger.info(f"Returning cached transcription for {audio_path}")
-            return self.cache[file_hash]
+            return cached
+
+        if self.model is None:
+            self.warmup()
+
+        # Preprocess audio in memory (decode to 16kHz mono + reduce noise),
+        # reusing the waveform if detect_language just decoded this file
+        audio = self._get_preprocessed(audio_path)
+        logger.info(f"Starting transcription for: {audio_path}")
 
-        # Preprocess audio (convert format + reduce noise)
-        processed_path = self.preprocess_audio(audio_path)
-        logger.info(f"Starting transcription for: {processed_path}")
-        
         try:
             # Check duration to decide on chunking
-            info = sf.info(processed_path)
-            duration = info.duration
-            
+            duration = len(audio) / 16000.0
+
             if duration > 600:  # If longer than 10 minutes
-                result = self._transcribe_chunked(processed_path, duration)
-                self.cache[file_hash] = result
-                self._save_cache()
+                result = self._transcribe_chunked(audio, duration)
+                self.cache.put(file_hash, result)
                 return result
 
-            # Whisper handles loading audio and resampling to 16kHz internally
-            result = self.model.transcribe(
-                processed_path,
-                fp16=(self.device == "cuda")
-            )
-            
-            text = result.get("text", "").strip()
-            language = result.get("language", "unknown")
-            segments = result.get("segments", [])
-            
-            # Calculate average confidence from segments
-            avg_confidence = 0.0
-            if segments:
-                # avg_logprob is log base e
-                logprobs = [s.get("avg_logprob", -100.0) for s in segments]
-                # Convert to probability: exp(logprob)
-                probs = [torch.exp(torch.tensor(lp)).item() for lp in logprobs]
-                avg_confidence = sum(probs) / len(probs)
-            
-            logger.info(f"Transcription complete. Language: {language}, Confidence: {avg_confidence:.2f}")
-            
-            return {
-                "text": text,
-                "language": language,
-                "confidence": avg_confidence,
-                "duration": duration,
-                "segments": segments
-            }
-            
+            # faster-whisper accepts the 16kHz float32 waveform directly
+            segments, info = self._run_transcription(audio)
+
+            return self._summarize_segments(segments, info.language, duration)
+
         except Exception as e:
             logger.error(f"Transcription failed: {e}")
             raise RuntimeError(f"Transcription failed: {e}")
         finally:
-            # Cleanup processed file if it was created
-            if processed_path != str(audio_path) and os.path.exists(processed_path):
-                os.remove(processed_path)
+            # Drop the memo once transcription consumed it; cache hits above
+            # never decode, so there is nothing worth holding onto
+            self._decoded_audio = None
 
     def detect_language(self, audio_path: Union[str, Path]) -> str:
         """
@@ -242,17 +524,16 @@ class WhisperSTTService:
         audio_path = str(audio_path)
         if not os.path.exists(audio_path):
             raise FileNotFoundError(f"Audio file not found: {audio_path}")
-            
-        # load audio and pad/trim it to fit 30 seconds
-        audio = whisper.load_audio(audio_path)
-        audio = whisper.pad_or_trim(audio)
-
-        # make log-Mel spectrogram and move to the same device as the model
-        mel = whisper.log_mel_spectrogram(audio).to(self.model.device)
-
-        # detect the spoken language
-        _, probs = self.model.detect_language(mel)
-        detected_lang = max(probs, key=probs.get)
-        
-        logger.info(f"Detected language: {detected_lang}")
-        return detected_lang
\ No newline at end of file
+
+        if self.model is None:
+            self.warmup()
+
+        # Language detection only needs the first 30 seconds; transcribe()
+        # runs detection eagerly before any decoding, so the (lazy) segment
+        # generator is never consumed. Decoding through the memo means a
+        # following transcribe_audio on the same file skips its own decode.
+        audio = self._get_preprocessed(audio_path)[: 30 * 16000]
+        _, info = self.model.transcribe(audio, beam_size=1)
+
+        logger.info(f"Detected language: {info.language}")
+        return info.language
\ No newline at end of file
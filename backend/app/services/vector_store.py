@@ -0,0 +1,15 @@
+import chromadb
+from loguru import logger
+
+# Process-wide Chroma clients, one per persist path. IngestionService and
+# RAGService hit the same collection; sharing the client means one SQLite
+# connection whose page cache stays warm, and writes from ingestion are
+# immediately visible to retrieval.
+_clients = {}
+
+def get_chroma_client(path: str):
+    """Returns the shared ChromaDB client for a persist path, opening it once."""
+    if path not in _clients:
+        logger.info(f"Opening shared ChromaDB client at {path}")
+        _clients[path] = chromadb.PersistentClient(path=path)
+    return _clients[path]
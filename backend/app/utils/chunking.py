@@ -1,13 +1,77 @@
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-
-class DocumentChunker:
-    def __init__(self):
-        self.splitter = RecursiveCharacterTextSplitter(
-            chunk_size=512,
-            chunk_overlap=64,
-            separators=["\n\n", "\n", ". ", " ", ""]
-        )
-
-    def semantic_chunking(self, text: str):
-        """Split by semantic boundaries"""
-        return self.splitter.split_text(text)
\ No newline at end of file
+import re
+
+import numpy as np
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+# Adjacent sentences below this cosine similarity start a new chunk
+SIMILARITY_THRESHOLD = 0.5
+
+# MiniLM truncates at 256 tokens; leave headroom for special tokens
+TOKENS_PER_CHUNK = 240
+CHUNK_OVERLAP = 32
+
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+
+class DocumentChunker:
+    def __init__(self):
+        # Chunks are sized in the embedder's own tokens (so no chunk
+        # silently loses its tail past MiniLM's limit), but only the
+        # tokenizer is needed for counting — not a second full copy of the
+        # embedding model. It loads lazily on first use so construction
+        # stays cheap, matching the services' warmup contract.
+        self._tokenizer = None
+        self._splitter = None
+
+    def _get_splitter(self) -> RecursiveCharacterTextSplitter:
+        """Builds the token-length splitter on first use."""
+        if self._splitter is None:
+            from transformers import AutoTokenizer
+            self._tokenizer = AutoTokenizer.from_pretrained(
+                "sentence-transformers/all-MiniLM-L6-v2"
+            )
+            self._splitter = RecursiveCharacterTextSplitter.from_huggingface_tokenizer(
+                self._tokenizer,
+                chunk_size=TOKENS_PER_CHUNK,
+                chunk_overlap=CHUNK_OVERLAP,
+                separators=["\n\n", "\n", ". ", " ", ""]
+            )
+        return self._splitter
+
+    def _count_tokens(self, text: str) -> int:
+        return len(self._tokenizer.encode(text))
+
+    def semantic_chunking(self, text: str):
+        """Split by semantic boundaries"""
+        splitter = self._get_splitter()
+        sentences = [s.strip() for s in _SENTENCE_RE.split(text) if s.strip()]
+        if len(sentences) < 3:
+            return splitter.split_text(text)
+
+        try:
+            from app.services.embeddings import get_st_model
+            embeddings = get_st_model().encode(
+                sentences,
+                batch_size=128,
+                convert_to_numpy=True,
+                normalize_embeddings=True
+            )
+        except Exception:
+            # Embedding model unavailable; fall back to character splitting
+            return splitter.split_text(text)
+
+        # Vectorized breakpoint search: one cosine similarity per adjacent
+        # sentence pair, no Python-level loop over sentences
+        similarities = np.einsum("ij,ij->i", embeddings[:-1], embeddings[1:])
+        breaks = np.flatnonzero(similarities < SIMILARITY_THRESHOLD) + 1
+
+        # Reassemble contiguous sentence runs, re-splitting any run that
+        # exceeds the embedder's token budget
+        boundaries = np.concatenate(([0], breaks, [len(sentences)]))
+        chunks = []
+        for start, end in zip(boundaries[:-1], boundaries[1:]):
+            segment = " ".join(sentences[start:end])
+            if self._count_tokens(segment) <= TOKENS_PER_CHUNK:
+                chunks.append(segment)
+            else:
+                chunks.extend(splitter.split_text(segment))
+        return chunks
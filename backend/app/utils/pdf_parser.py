@@ -1,27 +1,27 @@
-import pypdf
-from typing import Any, Dict
-
-class DocumentParser:
-    def extract_text_from_pdf(self, pdf_path: str) -> str:
-        """Extract text preserving structure"""
-        text = ""
-        try:
-            reader = pypdf.PdfReader(pdf_path)
-            for page in reader.pages:
-                text += page.extract_text() or "" + "\n"
-        except Exception as e:
-            print(f"Error reading PDF {pdf_path}: {e}")
-        return text
-
-    def extract_metadata(self, pdf_path: str) -> Dict[str, Any]:
-        """Extract title, author, dates"""
-        try:
-            reader = pypdf.PdfReader(pdf_path)
-            info = reader.metadata
-            return {
-                "title": info.title if info and info.title else "Unknown",
-                "author": info.author if info and info.author else "Unknown",
-                "pages": len(reader.pages)
-            }
-        except Exception:
-            return {"title": "Unknown", "author": "Unknown", "pages": 0}
\ No newline at end of file
+import fitz  # PyMuPDF: C-backed parsing, several times faster than pure-Python readers
+from typing import Any, Dict
+
+class DocumentParser:
+    def extract_text_from_pdf(self, pdf_path: str) -> str:
+        """Extract text preserving structure"""
+        parts = []
+        try:
+            with fitz.open(pdf_path) as doc:
+                for page in doc:
+                    parts.append(page.get_text("text"))
+        except Exception as e:
+            print(f"Error reading PDF {pdf_path}: {e}")
+        return "\n".join(parts)
+
+    def extract_metadata(self, pdf_path: str) -> Dict[str, Any]:
+        """Extract title, author, dates"""
+        try:
+            with fitz.open(pdf_path) as doc:
+                info = doc.metadata or {}
+                return {
+                    "title": info.get("title") or "Unknown",
+                    "author": info.get("author") or "Unknown",
+                    "pages": doc.page_count
+                }
+        except Exception:
+            return {"title": "Unknown", "author": "Unknown", "pages": 0}
@@ -1,13 +1,19 @@
 import json
-import shutil
 import os
+import asyncio
+
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
 from typing import List, Optional, Dict, Any
 from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
 from app.services.rag_service import RAGService
-from app.services.stt_service import WhisperSTTService
+from app.services.stt_service import WhisperSTTService, new_content_hasher
 
 app = FastAPI()
 
@@ -20,11 +26,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize Services
-# These will load models upon startup
+# Initialize Services (construction is cheap; models load in warmup below)
 rag_service = RAGService()
 stt_service = WhisperSTTService()
 
+@app.on_event("startup")
+async def warmup_models():
+    """Loads the heavy models concurrently at startup."""
+    await asyncio.gather(
+        asyncio.to_thread(rag_service.warmup),
+        asyncio.to_thread(stt_service.warmup),
+    )
+
 # This is the health check endpoint you requested
 @app.get("/")
 async def root():
@@ -63,13 +76,20 @@ async def ask_audio(
     use_rag: bool = Form(True)
 ):
     try:
-        # 1. Save uploaded file temporarily
+        # 1. Save uploaded file temporarily, reading in 1MB chunks so the
+        # event loop keeps serving other requests during large uploads
+        # (copyfileobj blocked the loop for the whole transfer)
         temp_filename = f"temp_{file.filename}"
+        # Hash the bytes as they stream in so the transcription cache key
+        # is ready without re-reading the file from disk
+        hasher = new_content_hasher()
         with open(temp_filename, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+            while chunk := await file.read(1 << 20):
+                hasher.update(chunk)
+                buffer.write(chunk)
             
         # 2. Transcribe Audio
-        transcription = stt_service.transcribe_audio(temp_filename)
+        transcription = stt_service.transcribe_audio(temp_filename, precomputed_hash=hasher.hexdigest())
         query_text = transcription["text"]
         
         # 3. Generate Answer using RAG
@@ -3,6 +3,8 @@ import os
 from pathlib import Path
 import argparse
 import hashlib
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from tqdm import tqdm
 
 # Add the backend directory to sys.path to allow imports from app
@@ -11,24 +13,58 @@ backend_path = Path(__file__).resolve().parent.parent
 sys.path.append(str(backend_path))
 
 from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain.schema import Document
 from loguru import logger
 
 from app.core.config import settings
+from app.services.embeddings import SharedEmbeddings, get_st_model
 from app.utils.pdf_parser import DocumentParser
 from app.utils.chunking import DocumentChunker
 
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
 # --- Helper Functions ---
 
 def _generate_chunk_ids(chunks: list[Document]) -> list[str]:
     """Generates deterministic IDs for document chunks."""
-    return [
-        hashlib.sha256(
-            f"{chunk.metadata['source']}-{chunk.metadata['page']}-{chunk.page_content}".encode()
-        ).hexdigest()
-        for chunk in chunks
+    # These are dedupe keys for Chroma, not security hashes: BLAKE3 runs
+    # SIMD-parallel, and streaming the fields through update() skips the
+    # large intermediate f-string per chunk. blake2b is the stdlib fallback.
+    new_hash = blake3.blake3 if blake3 is not None else hashlib.blake2b
+    ids = []
+    for chunk in chunks:
+        h = new_hash()
+        h.update(chunk.metadata['source'].encode())
+        h.update(str(chunk.metadata['page']).encode())
+        h.update(chunk.page_content.encode())
+        ids.append(h.hexdigest())
+    return ids
+
+def _parse_and_chunk(pdf_path: Path) -> tuple[list[Document], list[str]]:
+    """
+    Parses and chunks one PDF, returning (chunks, chunk_ids).
+
+    Module-level so it can run in a worker process: parsing and chunking
+    are the CPU-bound part of ingestion and parallelize per file.
+    """
+    parser = DocumentParser()
+    chunker = DocumentChunker()
+
+    text = parser.extract_text_from_pdf(str(pdf_path))
+    if not text.strip():
+        return [], []
+
+    metadata = parser.extract_metadata(str(pdf_path))
+    metadata["source"] = pdf_path.name
+
+    chunks = [
+        Document(page_content=content, metadata={**metadata, "page": i})
+        for i, content in enumerate(chunker.semantic_chunking(text))
     ]
+    return chunks, _generate_chunk_ids(chunks)
 
 def get_vector_db_client() -> Chroma:
     """Initializes and returns the ChromaDB client."""
@@ -41,8 +77,11 @@ def get_vector_db_client() -> Chroma:
             db_path_setting = Path(*db_path_setting.parts[1:])
         vector_db_path = str(backend_root / db_path_setting)
 
+    # Shared embedder honours EMBEDDINGS_INT8_PATH, so pointing it at an
+    # int8 ONNX export quantizes ingestion too — and the bulk encode pass
+    # reuses the same loaded model instead of a second fp32 copy
     logger.info("Initializing embedding model (sentence-transformers/all-MiniLM-L6-v2)...")
-    embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+    embeddings = SharedEmbeddings()
 
     logger.info(f"Initializing Vector DB at {vector_db_path}...")
     return Chroma(
@@ -51,35 +90,85 @@ def get_vector_db_client() -> Chroma:
         collection_name="rag_documents"
     )
 
+def _tune_sqlite_for_ingest(vector_db: Chroma):
+    """
+    Relaxes durability on Chroma's backing SQLite for the bulk load:
+    WAL avoids rewriting the journal per transaction (and persists in the
+    database file), NORMAL skips the fsync-per-commit of FULL.
+    """
+    try:
+        db_file = Path(vector_db._persist_directory) / "chroma.sqlite3"
+        if db_file.exists():
+            with sqlite3.connect(db_file) as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+    except Exception as e:
+        logger.warning(f"Could not tune SQLite pragmas: {e}")
+
 # --- Core Logic Functions ---
 
 def ingest_logic(files_to_process: list[Path], vector_db: Chroma, reingest: bool):
     """Handles the ingestion of documents."""
-    parser = DocumentParser()
-    chunker = DocumentChunker()
-
     logger.info(f"Processing {len(files_to_process)} file(s)...")
-    for pdf_file in tqdm(files_to_process, desc="Ingesting Documents"):
-        try:
-            if reingest:
-                logger.info(f"Re-ingesting: Deleting existing entries for {pdf_file.name}...")
-                delete_logic(pdf_file.name, vector_db)
-
-            logger.info(f"Processing {pdf_file.name}...")
-            documents = parser.parse_pdf(pdf_file)
-            chunks = chunker.chunk_documents(documents)
-            
-            if chunks:
-                chunk_ids = _generate_chunk_ids(chunks)
-                vector_db.add_documents(documents=chunks, ids=chunk_ids)
-                if hasattr(vector_db, "persist"):
-                    vector_db.persist()
-                logger.info(f"Successfully ingested {len(chunks)} chunks from {pdf_file.name}")
-            else:
-                logger.warning(f"No chunks created for {pdf_file.name}")
+    _tune_sqlite_for_ingest(vector_db)
+
+    if reingest:
+        for pdf_file in files_to_process:
+            logger.info(f"Re-ingesting: Deleting existing entries for {pdf_file.name}...")
+            delete_logic(pdf_file.name, vector_db)
+
+    # Parse and chunk across cores, accumulating every chunk from the run
+    all_chunks: list[Document] = []
+    all_ids: list[str] = []
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = {executor.submit(_parse_and_chunk, pdf_file): pdf_file for pdf_file in files_to_process}
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Parsing Documents"):
+            pdf_file = futures[future]
+            try:
+                chunks, chunk_ids = future.result()
+
+                if chunks:
+                    all_chunks.extend(chunks)
+                    all_ids.extend(chunk_ids)
+                    logger.info(f"Parsed {len(chunks)} chunks from {pdf_file.name}")
+                else:
+                    logger.warning(f"No chunks created for {pdf_file.name}")
+
+            except Exception as e:
+                logger.error(f"Failed to parse {pdf_file.name}: {e}")
+
+    if not all_chunks:
+        logger.warning("No chunks to ingest.")
+        return
+
+    # One bulk forward pass for the whole run: large batches keep the
+    # embedding model saturated instead of a small encode per file
+    texts = [chunk.page_content for chunk in all_chunks]
+    logger.info(f"Embedding {len(texts)} chunks...")
+    embeddings = get_st_model().encode(
+        texts,
+        batch_size=256,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=True
+    )
 
-        except Exception as e:
-            logger.error(f"Failed to ingest {pdf_file.name}: {e}")
+    # Precomputed vectors go straight to the underlying collection so
+    # Chroma does not re-embed them. Upsert makes re-running the script
+    # idempotent on the deterministic chunk IDs, batched to bound each
+    # transaction, with a single persist for the whole run.
+    metadatas = [chunk.metadata for chunk in all_chunks]
+    batch_size = 5000
+    for i in range(0, len(all_ids), batch_size):
+        vector_db._collection.upsert(
+            ids=all_ids[i:i + batch_size],
+            documents=texts[i:i + batch_size],
+            metadatas=metadatas[i:i + batch_size],
+            embeddings=embeddings[i:i + batch_size].tolist()
+        )
+    if hasattr(vector_db, "persist"):
+        vector_db.persist()
+    logger.info(f"Successfully ingested {len(all_chunks)} chunks from {len(files_to_process)} file(s)")
 
 def delete_logic(filename: str, vector_db: Chroma):
     """Handles the deletion of a document."""